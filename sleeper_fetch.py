@@ -11,40 +11,103 @@
 # - Named helpers for rosters (readable) and current-week matchups
 #
 # Output files:
-#   data/sleeper/The-ick-Is-In/latest.json
+#   data/sleeper/The-ick-Is-In/latest.json            (hardlink to the timestamped file)
 #   data/sleeper/The-ick-Is-In/<season>-wk<week>-<timestamp>.json
+#   data/sleeper/The-ick-Is-In/latest.json.gz         (if WRITE_GZIP)
+#   data/sleeper/The-ick-Is-In/latest.ndjson          (if WRITE_NDJSON)
 
+import argparse
+import contextlib
+import functools
+import gzip
 import json
+import mmap
+import operator
+import os
 import pathlib
-import re
+import shutil
+import tempfile
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime, timezone
-from typing import Dict, List, Any, Iterable
+from typing import AbstractSet, Dict, List, Any, BinaryIO, Iterable, Iterator, Optional, Tuple
 
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.exceptions import ProtocolError
+from urllib3.util.retry import Retry
+
+try:
+    import ijson  # streaming parser for the multi-MB players catalog
+except ImportError:  # fall back to a full in-memory parse
+    ijson = None
+
+try:
+    import simdjson  # SIMD parser with lazy proxies for the players catalog
+except ImportError:  # fall back to ijson / stdlib
+    simdjson = None
+
+try:
+    import orjson  # much faster encoder for the snapshot/cache writes
+except ImportError:  # fall back to stdlib json
+    orjson = None
 
 # ----------------------------
 # Config — change if needed
 # ----------------------------
 LEAGUE_ID = "1257451535101612032"
 LEAGUE_NAME = "The *ick Is In!"
+LEAGUE_SLUG = "The-ick-Is-In"  # output folder name; keep in step with LEAGUE_NAME
 USER_AGENT = "sleeper-cheat-fetch/2.1 (+GitHub Actions)"
-SLEEP = 0.10                 # polite pause between HTTP calls (seconds)
-MAX_RETRIES = 3              # retries per request
+RATE_LIMIT = 8.0             # sustained requests/second to Sleeper (token bucket)
+RATE_BURST = 16              # requests allowed back-to-back before pacing kicks in
+RATE_LOW_WATER = 5           # pause when X-RateLimit-Remaining drops below this
+MAX_RETRIES = 3              # attempts per request
 RETRY_BACKOFF = 0.8          # seconds, exponential
+MAX_WORKERS = 8              # thread pool size for per-week / per-draft fetches
 
 # If True, also build "named" (human-readable) expansions for ALL weeks' matchups.
 # This can make the JSON very large for big leagues. Default: only name current week.
 NAME_ALL_WEEKS = False
 
+# If False, skip building "matchups_named_current" (readable current-week matchups) and
+# leave it out of the snapshot — for consumers that only read the raw matchups.
+EMIT_NAMED_CURRENT = True
+
+# How long (seconds) the cached players catalog is trusted before re-validating it with
+# a conditional GET. Sleeper asks that /players/nfl be fetched at most once per day.
+PLAYERS_TTL = 86400
+
 # If True, include only the player IDs used by your league in the snapshot's players_index
 # (the full catalog is still cached on disk). Greatly reduces latest.json size.
 SLIM_PLAYERS_INDEX_IN_SNAPSHOT = True
 
+# If True, write snapshots indented (indent=2) for humans diffing them; by default they
+# are compact, which roughly halves their size and the encoding work. The timestamped
+# file and latest.json are the same bytes either way.
+PRETTY_SNAPSHOT = False
+
+# If True, also write latest.ndjson: one JSON record per line (state, each user, roster,
+# matchup and transaction) so consumers can stream it instead of loading latest.json.
+WRITE_NDJSON = True
+
+# If True, also write latest.json.gz (gzip level 6) for cheaper artifact storage/downloads.
+WRITE_GZIP = True
+
+# Team DEFs appear in rosters/matchups as team codes ("SF", "PHI", ...) instead of player IDs
+NFL_TEAMS = frozenset({
+    "ARI", "ATL", "BAL", "BUF", "CAR", "CHI", "CIN", "CLE", "DAL", "DEN", "DET",
+    "GB", "HOU", "IND", "JAX", "KC", "LAC", "LAR", "LV", "MIA", "MIN", "NE",
+    "NO", "NYG", "NYJ", "PHI", "PIT", "SEA", "SF", "TB", "TEN", "WAS",
+})
+
+# Shared readable dicts for DEF codes (see resolve_player)
+RESOLVED_DEFS = {t: {"id": t, "name": f"{t} D/ST", "pos": "DEF", "team": t} for t in NFL_TEAMS}
+
 # ----------------------------
 # Paths
 # ----------------------------
-LEAGUE_SLUG = re.sub(r"[^A-Za-z0-9]+", "-", LEAGUE_NAME).strip("-")
 BASE = "https://api.sleeper.app/v1"
 
 OUTDIR = pathlib.Path("data/sleeper") / LEAGUE_SLUG
@@ -53,101 +116,417 @@ OUTDIR.mkdir(parents=True, exist_ok=True)
 PLAYERS_DIR = pathlib.Path("data/sleeper/players")
 PLAYERS_DIR.mkdir(parents=True, exist_ok=True)
 PLAYERS_CACHE = PLAYERS_DIR / "players-lite.json"
+PLAYERS_META = PLAYERS_DIR / "players-lite.meta.json"  # {"etag", "last_modified", "fetched_at"}
 
-# Reusable HTTP session
+# Reusable HTTP session: keep-alive pool sized so sockets are shared across workers, and
+# transient failures retried with exponential backoff (honouring Retry-After on 429).
+# requests already advertises every Content-Encoding urllib3 can decode (gzip, plus br/zstd
+# when brotli/zstandard are installed), so the big /players/nfl body comes compressed.
 SESSION = requests.Session()
 SESSION.headers.update({"User-Agent": USER_AGENT})
+_RETRY = Retry(
+    total=MAX_RETRIES - 1,  # MAX_RETRIES attempts in all
+    backoff_factor=RETRY_BACKOFF,
+    status_forcelist=(429, 500, 502, 503, 504),
+    respect_retry_after_header=True,
+)
+# Worst case in flight: main()'s 7 concurrent fetches, 3 of which fan out via get_many
+_POOL_SIZE = 7 + 3 * MAX_WORKERS
+_ADAPTER = HTTPAdapter(pool_connections=16, pool_maxsize=_POOL_SIZE, max_retries=_RETRY)
+SESSION.mount("https://", _ADAPTER)
+SESSION.mount("http://", _ADAPTER)
 
 
 # ----------------------------
 # HTTP helpers
 # ----------------------------
-def get(url: str, pause: float = SLEEP) -> Any:
-    """GET with simple retries/backoff for 429/5xx."""
-    last_err = None
+class TokenBucket:
+    """Thread-safe token bucket: up to `burst` calls go straight through, then calls pace to `rate`/s."""
+
+    def __init__(self, rate: float, burst: int):
+        self.rate = rate
+        self.burst = burst
+        self._tokens = float(burst)
+        self._stamp = time.monotonic()
+        self._lock = threading.Lock()
+
+    def take(self) -> None:
+        """Consume one token, sleeping only if the bucket is empty."""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._stamp) * self.rate)
+            self._stamp = now
+            self._tokens -= 1
+            # A negative balance reserves a future slot for this caller
+            wait = -self._tokens / self.rate if self._tokens < 0 else 0.0
+        if wait:
+            time.sleep(wait)
+
+    def hold(self, seconds: float) -> None:
+        """Empty the bucket so no call goes out for roughly `seconds`."""
+        with self._lock:
+            self._tokens = min(self._tokens, 0.0) - seconds * self.rate
+
+
+BUCKET = TokenBucket(RATE_LIMIT, RATE_BURST)
+
+# A connection dropped mid-body: requests wraps it when reading .content, raw reads leak
+# urllib3's ProtocolError. The adapter's Retry never sees these (headers already arrived).
+BODY_ERRORS = (requests.exceptions.ChunkedEncodingError, requests.exceptions.ConnectionError, ProtocolError)
+
+
+def get_response(url: str, stream: bool = False, headers: Optional[Dict[str, str]] = None) -> requests.Response:
+    """
+    GET paced by BUCKET (which also backs off when rate-limit headers say so); 429/5xx and
+    connection errors are retried with backoff by the session's adapter.
+    Returns the raw Response (304 is not an error).
+    """
+    BUCKET.take()
+    r = SESSION.get(url, timeout=60, stream=stream, headers=headers)
+    r.raise_for_status()
+    _throttle_from_headers(r)
+    return r
+
+
+def _throttle_from_headers(r: requests.Response) -> None:
+    """Hold BUCKET when the server reports we're nearly out of quota (X-RateLimit-Remaining)."""
+    remaining = r.headers.get("X-RateLimit-Remaining")
+    if remaining is None or not remaining.isdigit() or int(remaining) >= RATE_LOW_WATER:
+        return
+    try:
+        wait = float(r.headers.get("Retry-After") or 1)
+    except ValueError:  # HTTP-date form; just back off a second
+        wait = 1.0
+    print(f"[INFO] Rate limit nearly exhausted ({remaining} left); pausing {wait:.1f}s")
+    BUCKET.hold(wait)
+
+
+def get_content(url: str) -> bytes:
+    """
+    GET and return the body. The adapter's Retry only covers failures before the headers
+    arrive, so a connection dropped mid-body is re-requested here (MAX_RETRIES attempts).
+    """
     for attempt in range(1, MAX_RETRIES + 1):
-        try:
-            r = SESSION.get(url, timeout=60)
-            # Retry on common transient statuses
-            if r.status_code in (429, 500, 502, 503, 504):
-                raise requests.HTTPError(f"{r.status_code} {r.reason}")
-            r.raise_for_status()
-            if pause:
-                time.sleep(pause)
-            return r.json()
-        except Exception as e:
-            last_err = e
-            if attempt < MAX_RETRIES:
-                time.sleep(RETRY_BACKOFF * (2 ** (attempt - 1)))
-            else:
-                raise
-    raise last_err  # pragma: no cover
+        with get_response(url, stream=True) as r:
+            try:
+                return r.content
+            except BODY_ERRORS as e:
+                if attempt == MAX_RETRIES:
+                    raise
+                print(f"[WARN] {url} body read failed ({e}); retrying")
+        time.sleep(RETRY_BACKOFF * (2 ** (attempt - 1)))
+    raise AssertionError("unreachable")  # pragma: no cover
+
+
+def get(url: str) -> Any:
+    """GET and decode JSON (see get_content / get_response for retries and rate limiting)."""
+    return loads(get_content(url))
+
+
+def get_with_raw(url: str) -> Tuple[Any, bytes]:
+    """Like get(), but also return the response body so it can be written out verbatim."""
+    content = get_content(url)
+    return loads(content), content
+
+
+def get_many(urls: Dict[Any, str], what: str) -> Dict[Any, Any]:
+    """
+    GET {key: url} concurrently on the shared session; returns {key: json} in input order.
+    Failures are logged as "<what> <key> failed" and map to [].
+    """
+    out: Dict[Any, Any] = {}
+    if not urls:
+        return out
+    with ThreadPoolExecutor(max_workers=MAX_WORKERS) as ex:
+        futures = {ex.submit(get, url): key for key, url in urls.items()}
+        for fut in as_completed(futures):
+            key = futures[fut]
+            try:
+                out[key] = fut.result()
+            except Exception as e:
+                print(f"[WARN] {what} {key} failed: {e}")
+                out[key] = []
+    return {key: out[key] for key in urls}
+
+
+# ----------------------------
+# JSON helpers
+# ----------------------------
+def loads(data: bytes) -> Any:
+    """Parse JSON bytes (orjson when available)."""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def dumps(obj: Any, indent: bool = False) -> bytes:
+    """Serialize to UTF-8 JSON bytes (orjson when available), optionally 2-space indented."""
+    if orjson is not None:
+        option = orjson.OPT_NON_STR_KEYS | (orjson.OPT_INDENT_2 if indent else 0)
+        return orjson.dumps(obj, option=option)
+    if indent:
+        return json.dumps(obj, indent=2).encode()
+    return json.dumps(obj, separators=(",", ":")).encode()
+
+
+@contextlib.contextmanager
+def atomic_open(path: pathlib.Path) -> Iterator[BinaryIO]:
+    """
+    Open "<path>.tmp" for binary writing and os.replace() it over path once the block
+    succeeds, so readers never see a half-written file (the tmp file is removed on error).
+    """
+    tmp = path.with_name(path.name + ".tmp")
+    try:
+        with open(tmp, "wb") as f:
+            yield f
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, path)
+    except BaseException:
+        tmp.unlink(missing_ok=True)
+        raise
+
+
+def atomic_link(src: pathlib.Path, dst: pathlib.Path) -> None:
+    """Make dst a hardlink to src (a copy if the filesystem can't link), swapped in atomically."""
+    tmp = dst.with_name(dst.name + ".tmp")
+    tmp.unlink(missing_ok=True)
+    try:
+        os.link(src, tmp)
+    except OSError:
+        shutil.copyfile(src, tmp)
+    os.replace(tmp, dst)
+
+
+def write_json(f: BinaryIO, obj: Any, indent: bool = False, depth: int = 3,
+               raw: Optional[Dict[str, Any]] = None, _level: int = 0) -> None:
+    """
+    Stream obj to the binary file f, encoding dicts item by item for the top `depth`
+    levels so the whole document never sits in memory as one buffer. Same bytes as dumps()
+    unless `raw` is given: it maps top-level keys to already-encoded JSON (bytes/mmap)
+    written verbatim, so only pass it for compact output (it is not re-indented).
+    """
+    if depth <= 0 or not isinstance(obj, dict) or not obj:
+        data = dumps(obj, indent)
+        if indent and _level:
+            # Re-indent the nested value (encoders escape newlines inside strings)
+            data = data.replace(b"\n", b"\n" + b"  " * _level)
+        f.write(data)
+        return
+    newline = b"\n" + b"  " * (_level + 1) if indent else b""
+    f.write(b"{")
+    for i, (key, value) in enumerate(obj.items()):
+        f.write(b"," + newline if i else newline)
+        f.write(dumps(str(key)) + (b": " if indent else b":"))
+        if raw and key in raw:
+            f.write(raw[key])
+        else:
+            write_json(f, value, indent, depth - 1, _level=_level + 1)
+    f.write((b"\n" + b"  " * _level if indent else b"") + b"}")
 
 
 # ----------------------------
 # Data builders
 # ----------------------------
-def get_players_index(force_refresh: bool = False) -> Dict[str, Dict[str, Any]]:
+_PLAYER_FIELDS = ("full_name", "first_name", "position", "team", "status")
+_get_player_fields = operator.itemgetter(*_PLAYER_FIELDS)
+
+
+def slim_player(pdata: Dict[str, Any]) -> Dict[str, Any]:
+    """Project one /players/nfl entry down to {name,pos,team,status}."""
+    try:
+        full_name, first_name, pos, team, status = _get_player_fields(pdata)  # one C-level call
+    except KeyError:  # sparse entry missing some fields
+        full_name, first_name, pos, team, status = (pdata.get(k) for k in _PLAYER_FIELDS)
+    return {"name": full_name or first_name, "pos": pos, "team": team, "status": status}
+
+
+def get_players_index(force_refresh: bool = False,
+                      only: Optional[AbstractSet[str]] = None) -> Dict[str, Dict[str, Any]]:
     """
     Build a slim {player_id: {name,pos,team,status}} index from Sleeper's /players/nfl.
-    Cached to data/sleeper/players/players-lite.json so we don't redownload every run.
-    """
-    if PLAYERS_CACHE.exists() and not force_refresh:
-        with open(PLAYERS_CACHE, "r") as f:
-            return json.load(f)
+    Cached to data/sleeper/players/players-lite.json so we don't redownload every run:
+    within PLAYERS_TTL the cache is used as-is, after that (or with force_refresh) it is
+    re-validated with a conditional GET (ETag / Last-Modified) and only re-downloaded if
+    it changed.
 
-    print("[INFO] Downloading players catalog…")
-    players_all = get(f"{BASE}/players/nfl")
+    If `only` is given, just those IDs are returned ({} for unknown ones).
 
-    lite: Dict[str, Dict[str, Any]] = {}
-    for pid, pdata in players_all.items():
-        lite[pid] = {
-            "name": pdata.get("full_name") or pdata.get("first_name"),
-            "pos": pdata.get("position"),
-            "team": pdata.get("team"),
-            "status": pdata.get("status"),
-        }
+    The parsed cache file is memoized per process (keyed on its mtime and size, so a
+    rewritten cache is re-read); treat the returned dict as read-only and copy it if you
+    need to mutate it.
+    """
+    meta: Dict[str, Any] = {}
+    if PLAYERS_CACHE.exists():
+        meta = _read_players_meta()
+        if not force_refresh and time.time() - meta.get("fetched_at", 0) < PLAYERS_TTL:
+            return _read_players_cache(only)
+
+    headers = {}
+    if meta.get("etag"):
+        headers["If-None-Match"] = meta["etag"]
+    if meta.get("last_modified"):
+        headers["If-Modified-Since"] = meta["last_modified"]
+
+    url = f"{BASE}/players/nfl"
+    print("[INFO] Downloading players catalog…")
+    for attempt in range(1, MAX_RETRIES + 1):  # re-request if the body drops (see get_content)
+        with get_response(url, stream=True, headers=headers) as r:
+            if r.status_code == 304:
+                print("[INFO] Players catalog unchanged (304); reusing cache")
+                meta["fetched_at"] = time.time()
+                _write_players_meta(meta)
+                return _read_players_cache(only)
+            try:
+                lite = _slim_players_body(r)
+            except BODY_ERRORS as e:
+                if attempt == MAX_RETRIES:
+                    raise
+                print(f"[WARN] {url} body read failed ({e}); retrying")
+            else:
+                meta = {
+                    "etag": r.headers.get("ETag"),
+                    "last_modified": r.headers.get("Last-Modified"),
+                    "fetched_at": time.time(),
+                }
+                break
+        time.sleep(RETRY_BACKOFF * (2 ** (attempt - 1)))
 
-    with open(PLAYERS_CACHE, "w") as f:
-        json.dump(lite, f)  # keep cache compact (no indent)
+    with atomic_open(PLAYERS_CACHE) as f:
+        f.write(dumps(lite))  # keep cache compact (no indent)
+    _write_players_meta(meta)
 
     print(f"[INFO] Cached players index with {len(lite):,} entries")
+    if only is not None:
+        return {pid: lite.get(pid, {}) for pid in only}
     return lite
 
 
-def resolve_ids(ids: Iterable[Any], idx: Dict[str, Any]) -> List[Dict[str, Any]]:
-    """Turn a list of IDs (or DEF codes like 'SF') into readable dicts."""
-    out: List[Dict[str, Any]] = []
+def _slim_players_body(r: requests.Response) -> Dict[str, Dict[str, Any]]:
+    """Parse a streamed /players/nfl response into the slim index (simdjson > ijson > loads)."""
+    if simdjson is not None:
+        # Spool the body to a temp file and parse it from an mmap, so the parser reads
+        # from the page cache instead of a second in-memory copy of the body. Iterate
+        # items(): doc[pid] is a linear key scan, which makes a per-key loop O(n^2).
+        r.raw.decode_content = True
+        with tempfile.TemporaryFile(dir=PLAYERS_DIR) as tmp:
+            shutil.copyfileobj(r.raw, tmp)
+            tmp.flush()
+            with mmap.mmap(tmp.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                doc = simdjson.Parser().parse(mm)
+                lite = {pid: slim_player(pdata) for pid, pdata in doc.items()}
+                del doc  # release the parser's view before the mmap closes
+        return lite
+    if ijson is not None:
+        # Stream (pid, pdata) pairs so only the slim projection is ever resident
+        r.raw.decode_content = True
+        return {pid: slim_player(pdata) for pid, pdata in ijson.kvitems(r.raw, "")}
+    return {pid: slim_player(pdata) for pid, pdata in loads(r.content).items()}
+
+
+def _read_players_cache(only: Optional[AbstractSet[str]] = None) -> Dict[str, Dict[str, Any]]:
+    st = PLAYERS_CACHE.stat()
+    index = _parse_players_cache(st.st_mtime_ns, st.st_size)
+    if only is None:
+        return index
+    return {pid: index.get(pid, {}) for pid in only}
+
+
+@functools.lru_cache(maxsize=1)
+def _parse_players_cache(mtime_ns: int, size: int) -> Dict[str, Dict[str, Any]]:
+    """Parse players-lite.json; the arguments only key the memo to this version of the file."""
+    return loads(PLAYERS_CACHE.read_bytes())
+
+
+@contextlib.contextmanager
+def map_players_cache() -> Iterator[mmap.mmap]:
+    """Memory-map players-lite.json read-only; its bytes are the full players index as JSON."""
+    with open(PLAYERS_CACHE, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        yield mm
+
+
+def _read_players_meta() -> Dict[str, Any]:
+    try:
+        return loads(PLAYERS_META.read_bytes())
+    except (OSError, ValueError):
+        return {}
+
+
+def _write_players_meta(meta: Dict[str, Any]) -> None:
+    with atomic_open(PLAYERS_META) as f:
+        f.write(dumps(meta))
+
+
+def resolve_player(pid: Any, idx: Dict[str, Any]) -> Dict[str, Any]:
+    """Turn one ID (or DEF code like 'SF') into a readable dict."""
+    if pid in NFL_TEAMS:
+        return RESOLVED_DEFS[pid]
+    info = idx.get(str(pid)) or {}
+    return {
+        "id": str(pid),
+        "name": info.get("name") or str(pid),
+        "pos": info.get("pos"),
+        "team": info.get("team"),
+        "status": info.get("status"),
+    }
+
+
+class ResolvedPlayers(dict):
+    """
+    {id: readable dict} built on demand: each ID referenced by a roster or matchup is
+    resolved once and the same dict is shared by every later reference (DEF codes are
+    pre-seeded). Work and allocations scale with unique IDs used, not the index size.
+    """
+
+    def __init__(self, idx: Dict[str, Any]):
+        super().__init__(RESOLVED_DEFS)
+        self.idx = idx
+
+    def __missing__(self, pid: Any) -> Dict[str, Any]:
+        if not isinstance(pid, str):
+            return self[str(pid)]
+        info = self[pid] = resolve_player(pid, self.idx)
+        return info
+
+
+def resolve_ids(ids: Iterable[Any], resolved: ResolvedPlayers) -> List[Dict[str, Any]]:
+    """
+    Turn a list of IDs (or DEF codes like 'SF') into readable dicts via a ResolvedPlayers
+    table. The dicts are shared between calls; copy before mutating.
+    """
     if not ids:
-        return out
-    for pid in ids:
-        # Team DEFs are 2–3 letter codes like "SF", "PHI", etc.
-        if isinstance(pid, str) and pid.isalpha() and 2 <= len(pid) <= 3:
-            out.append({"id": pid, "name": f"{pid} D/ST", "pos": "DEF", "team": pid})
-            continue
-        info = idx.get(str(pid)) or {}
-        out.append({
-            "id": str(pid),
-            "name": info.get("name") or str(pid),
-            "pos": info.get("pos"),
-            "team": info.get("team"),
-            "status": info.get("status"),
-        })
-    return out
-
-
-def name_matchups(matchups: List[Dict[str, Any]], idx: Dict[str, Any]) -> List[Dict[str, Any]]:
-    named: List[Dict[str, Any]] = []
-    for m in matchups or []:
-        named.append({
-            "matchup_id": m.get("matchup_id"),
-            "roster_id": m.get("roster_id"),
-            "points": m.get("points", 0.0),
-            "starters": resolve_ids(m.get("starters"), idx),
-            "players": resolve_ids(m.get("players"), idx),
-            "players_points": m.get("players_points", {}),
-        })
-    return named
+        return []
+    return [resolved[pid] for pid in ids]
+
+
+def name_matchups(matchups: List[Dict[str, Any]], resolved: ResolvedPlayers) -> List[Dict[str, Any]]:
+    return [{
+        "matchup_id": m.get("matchup_id"),
+        "roster_id": m.get("roster_id"),
+        "points": m.get("points", 0.0),
+        "starters": resolve_ids(m.get("starters"), resolved),
+        "players": resolve_ids(m.get("players"), resolved),
+        "players_points": m.get("players_points", {}),
+    } for m in matchups or ()]
+
+
+def name_roster(r: Dict[str, Any], owners: Dict[str, str], resolved: ResolvedPlayers) -> Dict[str, Any]:
+    s = r.get("settings") or {}
+    md = r.get("metadata") or {}
+    owner_id = r.get("owner_id")
+    return {
+        "roster_id": r.get("roster_id"),
+        "owner_id": owner_id,
+        "owner_name": owners.get(owner_id, "Unknown"),
+        "record": md.get("record"),
+        "streak": md.get("streak"),
+        "waiver_position": s.get("waiver_position"),
+        "fpts": (s.get("fpts") or 0) + (s.get("fpts_decimal") or 0)/100,
+        "fpts_against": (s.get("fpts_against") or 0) + (s.get("fpts_against_decimal") or 0)/100,
+        "players": resolve_ids(r.get("players"), resolved),
+        "starters": resolve_ids(r.get("starters"), resolved),
+        "reserve": resolve_ids(r.get("reserve"), resolved),
+    }
 
 
 def fetch_matchups_by_week(league_id: str, week_to: int) -> Dict[str, Any]:
@@ -156,14 +535,8 @@ def fetch_matchups_by_week(league_id: str, week_to: int) -> Dict[str, Any]:
         week_to = int(week_to or 1)
     except Exception:
         week_to = 1
-    by_week: Dict[str, Any] = {}
-    for w in range(1, max(week_to, 1) + 1):
-        url = f"{BASE}/league/{league_id}/matchups/{w}"
-        try:
-            by_week[str(w)] = get(url)
-        except Exception as e:
-            print(f"[WARN] Matchups week {w} failed: {e}")
-            by_week[str(w)] = []
+    urls = {str(w): f"{BASE}/league/{league_id}/matchups/{w}" for w in range(1, max(week_to, 1) + 1)}
+    by_week = get_many(urls, "Matchups week")
     return {"by_week": by_week}
 
 
@@ -173,14 +546,8 @@ def fetch_transactions_by_week(league_id: str, week_to: int) -> Dict[str, Any]:
         week_to = int(week_to or 1)
     except Exception:
         week_to = 1
-    by_week: Dict[str, Any] = {}
-    for w in range(1, max(week_to, 1) + 1):
-        url = f"{BASE}/league/{league_id}/transactions/{w}"
-        try:
-            by_week[str(w)] = get(url)
-        except Exception as e:
-            print(f"[WARN] Transactions week {w} failed: {e}")
-            by_week[str(w)] = []
+    urls = {str(w): f"{BASE}/league/{league_id}/transactions/{w}" for w in range(1, max(week_to, 1) + 1)}
+    by_week = get_many(urls, "Transactions week")
     return {"by_week": by_week}
 
 
@@ -193,23 +560,10 @@ def fetch_drafts_package(league_id: str) -> Dict[str, Any]:
     }
     """
     drafts = get(f"{BASE}/league/{league_id}/drafts")
-    picks_by_draft: Dict[str, Any] = {}
-    traded_picks_by_draft: Dict[str, Any] = {}
-
-    for d in drafts or []:
-        draft_id = d.get("draft_id")
-        if not draft_id:
-            continue
-        try:
-            picks_by_draft[draft_id] = get(f"{BASE}/draft/{draft_id}/picks")
-        except Exception as e:
-            print(f"[WARN] Draft picks for {draft_id} failed: {e}")
-            picks_by_draft[draft_id] = []
-        try:
-            traded_picks_by_draft[draft_id] = get(f"{BASE}/draft/{draft_id}/traded_picks")
-        except Exception as e:
-            print(f"[WARN] Draft traded picks for {draft_id} failed: {e}")
-            traded_picks_by_draft[draft_id] = []
+    draft_ids = [d.get("draft_id") for d in drafts or [] if d.get("draft_id")]
+    picks_by_draft = get_many({i: f"{BASE}/draft/{i}/picks" for i in draft_ids}, "Draft picks for")
+    traded_picks_by_draft = get_many({i: f"{BASE}/draft/{i}/traded_picks" for i in draft_ids},
+                                     "Draft traded picks for")
 
     return {
         "drafts": drafts,
@@ -218,49 +572,56 @@ def fetch_drafts_package(league_id: str) -> Dict[str, Any]:
     }
 
 
+ROSTER_ID_KEYS = ("players", "starters", "reserve")
+MATCHUP_ID_KEYS = ("players", "starters")
+
+
 def collect_used_player_ids(rosters: List[Dict[str, Any]], matchups_by_week: Dict[str, Any]) -> set:
     """Collect all player IDs that appear in rosters and matchups (for slimming index)."""
-    used: set = set()
-    # From rosters (players / starters / reserve)
-    for r in rosters or []:
-        for key in ("players", "starters", "reserve"):
-            for pid in (r.get(key) or []):
-                if isinstance(pid, str) and pid.isalpha() and 2 <= len(pid) <= 3:
-                    continue  # DEF code, not a player id
-                used.add(str(pid))
-    # From matchups (players / starters)
     by_week = (matchups_by_week or {}).get("by_week", {})
-    for wk, arr in by_week.items():
-        for m in arr or []:
-            for key in ("players", "starters"):
-                for pid in (m.get(key) or []):
-                    if isinstance(pid, str) and pid.isalpha() and 2 <= len(pid) <= 3:
-                        continue
-                    used.add(str(pid))
+    used: set = set().union(
+        # From rosters (players / starters / reserve)
+        *(map(str, r.get(key) or ()) for r in rosters or () for key in ROSTER_ID_KEYS),
+        # From matchups (players / starters)
+        *(map(str, m.get(key) or ()) for arr in by_week.values() for m in arr or () for key in MATCHUP_ID_KEYS),
+    )
+    used -= NFL_TEAMS  # DEF codes, not player ids
     return used
 
 
+# ----------------------------
+# NDJSON export (one record per line, tagged with "_section")
+# ----------------------------
+def iter_ndjson_records(snapshot: dict) -> Iterator[Dict[str, Any]]:
+    """Yield the snapshot's state, users, rosters, matchups and transactions as flat records."""
+    yield {"_section": "state", **(snapshot.get("state") or {})}
+    for section in ("users", "rosters"):
+        for i, rec in enumerate(snapshot.get(section) or []):
+            yield {"_section": section, "_i": i, **rec}
+    for section, key in (("matchups", "matchups_all_weeks"), ("transactions", "transactions_all_weeks")):
+        for wk, arr in ((snapshot.get(key) or {}).get("by_week") or {}).items():
+            for i, rec in enumerate(arr or []):
+                yield {"_section": section, "_week": wk, "_i": i, **rec}
+
+
+def write_ndjson(f: BinaryIO, snapshot: dict) -> None:
+    for rec in iter_ndjson_records(snapshot):
+        f.write(dumps(rec) + b"\n")
+
+
 # ----------------------------
 # Summary printer (handy in Action logs)
 # ----------------------------
 def print_week1_summary(snapshot: dict, team_name_exact: str = "Taylor Park Boys"):
     """Print Week 1 player-by-player points for your team to stdout (for Actions logs)."""
     try:
-        # Find owner_id by users[].metadata.team_name
-        owner_id = None
-        for u in snapshot.get("users", []):
-            tn = ((u.get("metadata") or {}).get("team_name") or "").strip().lower()
-            if tn == team_name_exact.lower():
-                owner_id = u.get("user_id")
-                break
+        # team_name -> owner_id and owner_id -> roster_id lookups
+        users_by_team = {((u.get("metadata") or {}).get("team_name") or "").strip().lower(): u.get("user_id")
+                         for u in snapshot.get("users", [])}
+        roster_by_owner = {r.get("owner_id"): r.get("roster_id") for r in snapshot.get("rosters", [])}
 
-        # Roster id
-        roster_id = None
-        if owner_id:
-            for r in snapshot.get("rosters", []):
-                if r.get("owner_id") == owner_id:
-                    roster_id = r.get("roster_id")
-                    break
+        owner_id = users_by_team.get(team_name_exact.lower())
+        roster_id = roster_by_owner.get(owner_id) if owner_id else None
         if roster_id is None:
             roster_id = 10  # fallback seen earlier
 
@@ -281,18 +642,16 @@ def print_week1_summary(snapshot: dict, team_name_exact: str = "Taylor Park Boys
         # items are dicts if named, otherwise raw ids
         ids = [(p.get("id") if isinstance(p, dict) else p) for p in starters]
         pp = m.get("players_points", {})
+        name_by_id = {P.get("id"): P.get("name") for P in starters if isinstance(P, dict)}
 
         rows = []
         total = 0.0
         for pid in ids:
             pts = float(pp.get(str(pid), 0.0))
-            # if named, find name in starters list; else resolve from index / DEF code
-            nm = None
-            for P in starters:
-                if isinstance(P, dict) and P.get("id") == pid:
-                    nm = P.get("name"); break
+            # if named, take the name from the starters list; else resolve from index / DEF code
+            nm = name_by_id.get(pid)
             if not nm:
-                if isinstance(pid, str) and pid.isalpha() and 2 <= len(pid) <= 3:
+                if pid in NFL_TEAMS:
                     nm = f"{pid} D/ST"
                 else:
                     nm = (pidx.get(str(pid), {}) or {}).get("name") or str(pid)
@@ -312,12 +671,25 @@ def print_week1_summary(snapshot: dict, team_name_exact: str = "Taylor Park Boys
 # ----------------------------
 # Main
 # ----------------------------
-def main():
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    """Command-line overrides for the config flags above."""
+    ap = argparse.ArgumentParser(description=f"Snapshot the Sleeper league {LEAGUE_NAME!r} to {OUTDIR}")
+    ap.add_argument("--week", type=int, help="fetch weeks 1..WEEK instead of Sleeper's current week")
+    ap.add_argument("--name-all-weeks", action="store_true", help="also name every week's matchups")
+    ap.add_argument("--no-named", action="store_true", help="skip the named current-week matchups")
+    return ap.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None):
+    args = parse_args(argv)
+    name_all_weeks = NAME_ALL_WEEKS or args.name_all_weeks
+    emit_named_current = EMIT_NAMED_CURRENT and not args.no_named
+
     # NFL state
-    state = get(f"{BASE}/state/nfl", pause=0.0)
+    state = get(f"{BASE}/state/nfl")
     # Guard week in case Sleeper ever reports 0/None between weeks
     try:
-        week = int(state.get("week") or 1)
+        week = int(args.week or state.get("week") or 1)
         if week <= 0:
             week = 1
     except Exception:
@@ -326,71 +698,64 @@ def main():
 
     print(f"[STATE] season={season} week={week}")
 
-    # League, users, rosters
-    league = get(f"{BASE}/league/{LEAGUE_ID}")
-    users = get(f"{BASE}/league/{LEAGUE_ID}/users")
-    rosters = get(f"{BASE}/league/{LEAGUE_ID}/rosters")
-
-    # Matchups (all weeks up to current)
-    matchups_all_weeks = fetch_matchups_by_week(LEAGUE_ID, week)
-
-    # Transactions (all weeks up to current)
-    transactions_all_weeks = fetch_transactions_by_week(LEAGUE_ID, week)
-
-    # Drafts package (drafts + picks + traded picks)
-    drafts_pkg = fetch_drafts_package(LEAGUE_ID)
+    # Everything below only needs `week`, so fetch it all side by side: league, users,
+    # rosters, matchups and transactions (all weeks up to current), drafts package
+    # (drafts + picks + traded picks) and league traded picks. The per-week/per-draft
+    # fetchers fan out further through get_many; BUCKET keeps the total rate polite.
+    with ThreadPoolExecutor(max_workers=7) as ex:
+        league_f = ex.submit(get, f"{BASE}/league/{LEAGUE_ID}")
+        users_f = ex.submit(get_with_raw, f"{BASE}/league/{LEAGUE_ID}/users")
+        rosters_f = ex.submit(get_with_raw, f"{BASE}/league/{LEAGUE_ID}/rosters")
+        matchups_f = ex.submit(fetch_matchups_by_week, LEAGUE_ID, week)
+        transactions_f = ex.submit(fetch_transactions_by_week, LEAGUE_ID, week)
+        drafts_f = ex.submit(fetch_drafts_package, LEAGUE_ID)
+        league_traded_picks_f = ex.submit(get, f"{BASE}/league/{LEAGUE_ID}/traded_picks")
+    league = league_f.result()
+    users, users_raw = users_f.result()
+    rosters, rosters_raw = rosters_f.result()
+    matchups_all_weeks = matchups_f.result()
+    transactions_all_weeks = transactions_f.result()
+    drafts_pkg = drafts_f.result()
 
     # League traded picks (non-draft-specific endpoint)
     try:
-        league_traded_picks = get(f"{BASE}/league/{LEAGUE_ID}/traded_picks")
+        league_traded_picks = league_traded_picks_f.result()
     except Exception as e:
         print(f"[WARN] league_traded_picks failed: {e}")
         league_traded_picks = []
 
-    # Players index (cached)
-    players_index_full = get_players_index(force_refresh=False)
-
-    # Optionally slim players_index to only used IDs in THIS league (for the snapshot)
+    # Players index (cached). Optionally slim it to only used IDs in THIS league (for the
+    # snapshot).
     if SLIM_PLAYERS_INDEX_IN_SNAPSHOT:
         used_ids = collect_used_player_ids(rosters, matchups_all_weeks)
-        players_index = {pid: players_index_full.get(pid, {}) for pid in used_ids}
-        print(f"[INFO] Slim players_index for snapshot: {len(players_index):,} of {len(players_index_full):,}")
+        players_index = get_players_index(force_refresh=False, only=used_ids)
+        print(f"[INFO] Slim players_index for snapshot: {len(players_index):,} players")
     else:
-        players_index = players_index_full
+        players_index = get_players_index(force_refresh=False)
+    resolved = ResolvedPlayers(players_index)
 
     # Readable helpers
     owners = {u["user_id"]: (u.get("display_name") or u.get("username") or "Unknown") for u in users}
-    rosters_named = []
-    for r in rosters or []:
-        rosters_named.append({
-            "roster_id": r.get("roster_id"),
-            "owner_id": r.get("owner_id"),
-            "owner_name": owners.get(r.get("owner_id"), "Unknown"),
-            "record": r.get("metadata", {}).get("record"),
-            "streak": r.get("metadata", {}).get("streak"),
-            "waiver_position": r.get("settings", {}).get("waiver_position"),
-            "fpts": (r.get("settings", {}).get("fpts") or 0) + (r.get("settings", {}).get("fpts_decimal") or 0)/100,
-            "fpts_against": (r.get("settings", {}).get("fpts_against") or 0) + (r.get("settings", {}).get("fpts_against_decimal") or 0)/100,
-            "players": resolve_ids(r.get("players"), players_index),
-            "starters": resolve_ids(r.get("starters"), players_index),
-            "reserve": resolve_ids(r.get("reserve"), players_index),
-        })
-
-    # Named matchups: current week always; optionally all weeks
-    current_week_arr = (matchups_all_weeks.get("by_week") or {}).get(str(week), []) or []
-    matchups_named_current = name_matchups(current_week_arr, players_index)
+    rosters_named = [name_roster(r, owners, resolved) for r in rosters or ()]
+
+    # Named matchups: current week (unless disabled); optionally all weeks
+    matchups_named_current = None
+    if emit_named_current:
+        current_week_arr = (matchups_all_weeks.get("by_week") or {}).get(str(week), []) or []
+        matchups_named_current = name_matchups(current_week_arr, resolved)
 
     matchups_all_weeks_named = None
-    if NAME_ALL_WEEKS:
+    if name_all_weeks:
         by_week_named = {}
         for wk, arr in (matchups_all_weeks.get("by_week") or {}).items():
-            by_week_named[wk] = name_matchups(arr or [], players_index)
+            by_week_named[wk] = name_matchups(arr or [], resolved)
         matchups_all_weeks_named = {"by_week": by_week_named}
 
-    # Build snapshot
+    # Build snapshot (one clock read for both fetched_at and the file timestamp)
+    now = datetime.now(timezone.utc)
     snapshot = {
         "snapshot_version": 3,
-        "fetched_at": datetime.now(timezone.utc).isoformat(),
+        "fetched_at": now.isoformat(),
         "season": season,
         "week": week,
 
@@ -420,25 +785,47 @@ def main():
         "transactions_all_weeks": transactions_all_weeks,   # raw by week 1..current
         "league_traded_picks": league_traded_picks,
 
-        "drafts_pkg": fetch_drafts_package(LEAGUE_ID),      # drafts + picks + traded picks by draft
+        "drafts_pkg": drafts_pkg,                           # drafts + picks + traded picks by draft
 
         "players_index": players_index,                     # slimmed (or full if flag is False)
     }
 
+    if matchups_named_current is None:
+        del snapshot["matchups_named_current"]  # EMIT_NAMED_CURRENT off: leave it out entirely
+
     if matchups_all_weeks_named is not None:
         snapshot["matchups_all_weeks_named"] = matchups_all_weeks_named  # optional large section
 
     # Save
-    ts = datetime.now(timezone.utc).strftime("%Y-%m-%dT%H%M%SZ")
+    ts = f"{now:%Y-%m-%dT%H%M%SZ}"
     path_ts = OUTDIR / f"{season}-wk{week}-{ts}.json"
     path_latest = OUTDIR / "latest.json"
-    with open(path_ts, "w") as f:
-        json.dump(snapshot, f, indent=2)
-    with open(path_latest, "w") as f:
-        json.dump(snapshot, f, indent=2)
-
+    with contextlib.ExitStack() as stack:
+        raw = None
+        if not PRETTY_SNAPSHOT:
+            # users/rosters go out exactly as Sleeper sent them (compact), so skip re-encoding
+            raw = {"users": users_raw, "rosters": rosters_raw}
+            if not SLIM_PLAYERS_INDEX_IN_SNAPSHOT:
+                # The full index is exactly the cache file: splice its bytes in, don't re-encode
+                raw["players_index"] = stack.enter_context(map_players_cache())
+        with atomic_open(path_ts) as f:
+            write_json(f, snapshot, indent=PRETTY_SNAPSHOT, raw=raw)  # streamed; encoded once for both files
+    atomic_link(path_ts, path_latest)  # same bytes, no second write
     print(f"[WRITE] {path_latest} and {path_ts}")
 
+    if WRITE_GZIP:
+        path_gz = OUTDIR / "latest.json.gz"
+        with atomic_open(path_gz) as f, open(path_ts, "rb") as src:
+            with gzip.GzipFile(filename=path_latest.name, fileobj=f, mode="wb", compresslevel=6) as gz:
+                shutil.copyfileobj(src, gz)  # compress the bytes already on disk, no re-encode
+        print(f"[WRITE] {path_gz}")
+
+    if WRITE_NDJSON:
+        path_ndjson = OUTDIR / "latest.ndjson"
+        with atomic_open(path_ndjson) as f:
+            write_ndjson(f, snapshot)
+        print(f"[WRITE] {path_ndjson}")
+
     # Helpful log summary (non-fatal if anything missing)
     print_week1_summary(snapshot, team_name_exact="Taylor Park Boys")
 